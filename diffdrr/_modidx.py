@@ -6,6 +6,7 @@ d = { 'settings': { 'branch': 'main',
                 'git_url': 'https://github.com/eigenvivek/DiffDRR',
                 'lib_path': 'diffdrr'},
   'syms': { 'diffdrr.data': { 'diffdrr.data.canonicalize': ('api/data.html#canonicalize', 'diffdrr/data.py'),
+                              'diffdrr.data.get_tissue_class': ('api/data.html#get_tissue_class', 'diffdrr/data.py'),
                               'diffdrr.data.load_example_ct': ('api/data.html#load_example_ct', 'diffdrr/data.py'),
                               'diffdrr.data.read': ('api/data.html#read', 'diffdrr/data.py'),
                               'diffdrr.data.transform_hu_to_density': ('api/data.html#transform_hu_to_density', 'diffdrr/data.py')},
@@ -28,9 +29,13 @@ d = { 'settings': { 'branch': 'main',
                              'diffdrr.drr.DRR.affine': ('api/drr.html#drr.affine', 'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.affine_inverse': ('api/drr.html#drr.affine_inverse', 'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.forward': ('api/drr.html#drr.forward', 'diffdrr/drr.py'),
+                             'diffdrr.drr.DRR.forward_fast': ('api/drr.html#drr.forward_fast', 'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.inverse_projection': ('api/drr.html#drr.inverse_projection', 'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.perspective_projection': ('api/drr.html#drr.perspective_projection', 'diffdrr/drr.py'),
+                             'diffdrr.drr.DRR.quantize_volume': ('api/drr.html#drr.quantize_volume', 'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.reshape_transform': ('api/drr.html#drr.reshape_transform', 'diffdrr/drr.py'),
+                             'diffdrr.drr.DRR.set_bone_attenuation_multiplier': ( 'api/drr.html#drr.set_bone_attenuation_multiplier',
+                                                                                  'diffdrr/drr.py'),
                              'diffdrr.drr.DRR.set_intrinsics': ('api/drr.html#drr.set_intrinsics', 'diffdrr/drr.py'),
                              'diffdrr.drr.reshape_subsampled_drr': ('api/drr.html#reshape_subsampled_drr', 'diffdrr/drr.py')},
             'diffdrr.metrics': { 'diffdrr.metrics.DoubleGeodesicSE3': ('api/metrics.html#doublegeodesicse3', 'diffdrr/metrics.py'),
@@ -153,25 +158,44 @@ d = { 'settings': { 'branch': 'main',
                                                                                          'diffdrr/registration.py')},
             'diffdrr.renderers': { 'diffdrr.renderers.Siddon': ('api/renderers.html#siddon', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers.Siddon.__init__': ('api/renderers.html#siddon.__init__', 'diffdrr/renderers.py'),
-                                   'diffdrr.renderers.Siddon.dims': ('api/renderers.html#siddon.dims', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers.Siddon._get_voxel': ('api/renderers.html#siddon._get_voxel', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers.Siddon.forward': ('api/renderers.html#siddon.forward', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers.Siddon.release_scratch': ( 'api/renderers.html#siddon.release_scratch',
+                                                                                 'diffdrr/renderers.py'),
                                    'diffdrr.renderers.Trilinear': ('api/renderers.html#trilinear', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers.Trilinear.__init__': ( 'api/renderers.html#trilinear.__init__',
                                                                              'diffdrr/renderers.py'),
-                                   'diffdrr.renderers.Trilinear.dims': ('api/renderers.html#trilinear.dims', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers.Trilinear.forward': ('api/renderers.html#trilinear.forward', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers._filter_intersections_outside_volume': ( 'api/renderers.html#_filter_intersections_outside_volume',
                                                                                                'diffdrr/renderers.py'),
                                    'diffdrr.renderers._get_alpha_minmax': ('api/renderers.html#_get_alpha_minmax', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers._get_alphas': ('api/renderers.html#_get_alphas', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_cached_geometry': ( 'api/renderers.html#_get_cached_geometry',
+                                                                               'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_cached_volume': ( 'api/renderers.html#_get_cached_volume',
+                                                                             'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_channel_sum': ('api/renderers.html#_get_channel_sum', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_midpoint_xyzs': ( 'api/renderers.html#_get_midpoint_xyzs',
+                                                                             'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_scratch': ('api/renderers.html#_get_scratch', 'diffdrr/renderers.py'),
                                    'diffdrr.renderers._get_voxel': ('api/renderers.html#_get_voxel', 'diffdrr/renderers.py'),
-                                   'diffdrr.renderers._get_xyzs': ('api/renderers.html#_get_xyzs', 'diffdrr/renderers.py')},
+                                   'diffdrr.renderers._get_voxel_index': ('api/renderers.html#_get_voxel_index', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_weighted_sum': ('api/renderers.html#_get_weighted_sum', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._get_xyzs': ('api/renderers.html#_get_xyzs', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._maybe_compile': ('api/renderers.html#_maybe_compile', 'diffdrr/renderers.py'),
+                                   'diffdrr.renderers._permute_volume': ('api/renderers.html#_permute_volume', 'diffdrr/renderers.py')},
             'diffdrr.utils': { 'diffdrr.utils.get_focal_length': ('api/utils.html#get_focal_length', 'diffdrr/utils.py'),
                                'diffdrr.utils.get_principal_point': ('api/utils.html#get_principal_point', 'diffdrr/utils.py'),
                                'diffdrr.utils.make_intrinsic_matrix': ('api/utils.html#make_intrinsic_matrix', 'diffdrr/utils.py'),
                                'diffdrr.utils.parse_intrinsic_matrix': ('api/utils.html#parse_intrinsic_matrix', 'diffdrr/utils.py')},
-            'diffdrr.visualization': { 'diffdrr.visualization._make_camera_frustum_mesh': ( 'api/visualization.html#_make_camera_frustum_mesh',
+            'diffdrr.visualization': { 'diffdrr.visualization._copy_to_host': ( 'api/visualization.html#_copy_to_host',
+                                                                                'diffdrr/visualization.py'),
+                                       'diffdrr.visualization._make_camera_frustum_mesh': ( 'api/visualization.html#_make_camera_frustum_mesh',
                                                                                             'diffdrr/visualization.py'),
+                                       'diffdrr.visualization._plot_drr_fast': ( 'api/visualization.html#_plot_drr_fast',
+                                                                                 'diffdrr/visualization.py'),
+                                       'diffdrr.visualization._sampling_dtype': ( 'api/visualization.html#_sampling_dtype',
+                                                                                  'diffdrr/visualization.py'),
                                        'diffdrr.visualization.animate': ('api/visualization.html#animate', 'diffdrr/visualization.py'),
                                        'diffdrr.visualization.drr_to_mesh': ( 'api/visualization.html#drr_to_mesh',
                                                                               'diffdrr/visualization.py'),
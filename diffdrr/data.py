@@ -108,12 +108,16 @@ def read(
         raise ValueError(f"Unrecognized orientation {orientation}")
 
     # Package the subject
+    if isinstance(labels, int):
+        labels = [labels]
     subject = Subject(
         volume=volume,
         mask=mask,
         reorient=reorient,
         density=density,
         fiducials=fiducials,
+        labels=labels,
+        bone_attenuation_multiplier=bone_attenuation_multiplier,
         **kwargs,
     )
 
@@ -123,11 +127,8 @@ def read(
 
     # Apply mask
     if labels is not None:
-        if isinstance(labels, int):
-            labels = [labels]
-        mask = torch.any(
-            torch.stack([subject.mask.data.squeeze() == idx for idx in labels]), dim=0
-        )
+        mask = subject.mask.data.squeeze()
+        mask = torch.isin(mask, torch.as_tensor(labels, device=mask.device))
         subject.density.data = subject.density.data * mask
 
     return subject
@@ -163,17 +164,25 @@ def canonicalize(subject):
     return subject
 
 # %% ../notebooks/api/03_data.ipynb 8
-def transform_hu_to_density(volume, bone_attenuation_multiplier):
+def get_tissue_class(volume):
+    """Label each voxel as air (0), soft tissue (1), or bone (2) from its HU value."""
+    boundaries = torch.tensor([-800.0, 350.0], device=volume.device)
+    return torch.bucketize(volume, boundaries).to(torch.uint8)
+
+
+def transform_hu_to_density(volume, bone_attenuation_multiplier, tissue_class=None):
     # volume can be loaded as int16, need to convert to float32 to use float bone_attenuation_multiplier
     volume = volume.to(torch.float32)
-    air = torch.where(volume <= -800)
-    soft_tissue = torch.where((-800 < volume) & (volume <= 350))
-    bone = torch.where(350 < volume)
-
-    density = torch.empty_like(volume)
-    density[air] = volume[soft_tissue].min()
-    density[soft_tissue] = volume[soft_tissue]
-    density[bone] = volume[bone] * bone_attenuation_multiplier
+    if tissue_class is None:
+        tissue_class = get_tissue_class(volume)
+    soft_min = torch.where(tissue_class == 1, volume, torch.inf).amin()
+
+    # Clamping raises air to the minimum soft tissue value
+    density = torch.where(
+        tissue_class == 2,
+        volume * bone_attenuation_multiplier,
+        volume.clamp(min=soft_min),
+    )
     density -= density.min()
     density /= density.max()
     return density
@@ -150,10 +150,9 @@ from .pose import RigidTransform
 def forward(self: Detector, extrinsic: RigidTransform, calibration: RigidTransform):
     """Create source and target points for X-rays to trace through the volume."""
     if calibration is None:
-        target = self.calibration(self.target)
-    else:
-        target = calibration(self.target)
+        calibration = self.calibration
     pose = self.reorient.compose(extrinsic)
     source = pose(self.source)
-    target = pose(target)
+    # Compose the 4x4 transforms so the detector plane is only transformed once
+    target = calibration.compose(pose)(self.target)
     return source, target
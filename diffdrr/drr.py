@@ -10,6 +10,7 @@ import torch
 import torch.nn as nn
 from fastcore.basics import patch
 
+from .data import get_tissue_class, transform_hu_to_density
 from .detector import Detector
 from .renderers import Siddon, Trilinear
 
@@ -84,16 +85,25 @@ class DRR(nn.Module):
             persistent=persistent,
         )
         self.register_buffer(
-            "density",
-            subject.density.data.squeeze(),
-            persistent=persistent,
-        )
+            "tissue_class",
+            get_tissue_class(self.volume.to(torch.float32)),
+            persistent=False,
+        )  # Label each voxel as air (0), soft tissue (1), or bone (2)
+        self.bone_attenuation_multiplier = subject.get("bone_attenuation_multiplier")
         if subject.mask is not None:
             self.register_buffer(
                 "mask",
                 subject.mask.data.to(torch.float32).squeeze(),
                 persistent=persistent,
             )
+        labels_mask = subject.get("labels")
+        if labels_mask is not None:
+            labels_mask = torch.isin(
+                subject.mask.data.squeeze(), torch.as_tensor(labels_mask)
+            )
+        self.register_buffer(
+            "labels_mask", labels_mask, persistent=False
+        )  # Voxels of the structures selected with `read(labels=...)`
 
         # Initialize the renderer
         if renderer == "siddon":
@@ -173,21 +183,36 @@ def forward(
         )
     else:
         n_points = target.shape[1] // self.n_patches
-        img = []
-        for idx in range(self.n_patches):
-            t = target[:, idx * n_points : (idx + 1) * n_points]
+        img = None
+        for idx in range(0, target.shape[1], n_points):
+            t = target[:, idx : idx + n_points]
             partial = self.renderer(
                 self.density,
                 source,
                 t,
                 **kwargs,
             )
-            img.append(partial)
-        img = torch.cat(img, dim=-1)
+            # Write each patch directly into a single preallocated output
+            if img is None:
+                img = partial.new_empty(*partial.shape[:-1], target.shape[1])
+            img[..., idx : idx + n_points] = partial
     return self.reshape_transform(img, batch_size=len(pose))
 
 # %% ../notebooks/api/00_drr.ipynb 11
 @patch
+def forward_fast(
+    self: DRR,
+    pose: RigidTransform,  # Batch of camera poses
+):
+    """Render full DRRs from a pose without the optional branches of `DRR.forward`."""
+    source, target = self.detector(pose, None)
+    source = self.affine_inverse(source)
+    target = self.affine_inverse(target)
+    img = self.renderer(self.density, source, target)
+    return self.reshape_transform(img, batch_size=len(pose))
+
+# %% ../notebooks/api/00_drr.ipynb 12
+@patch
 def set_intrinsics(
     self: DRR,
     sdd: float = None,
@@ -209,7 +234,51 @@ def set_intrinsics(
         reorient=self.subject.reorient,
     ).to(self.volume)
 
-# %% ../notebooks/api/00_drr.ipynb 12
+# %% ../notebooks/api/00_drr.ipynb 13
+@patch
+def set_bone_attenuation_multiplier(self: DRR, bone_attenuation_multiplier: float):
+    """Recompute the density of the CT volume with a new multiplier on bone."""
+    if bone_attenuation_multiplier == self.bone_attenuation_multiplier:
+        return
+    density = transform_hu_to_density(
+        self.volume.to(self.tissue_class.device),
+        bone_attenuation_multiplier,
+        self.tissue_class,
+    )
+    if self.labels_mask is not None:
+        density.mul_(self.labels_mask)
+    self.density = density
+    self.bone_attenuation_multiplier = bone_attenuation_multiplier
+    if isinstance(self.renderer, Siddon):
+        self.renderer.quantization = None
+    self.renderer._volume_cache = None
+
+# %% ../notebooks/api/00_drr.ipynb 14
+@patch
+def quantize_volume(self: DRR):
+    """Store the density as uint8 to reduce memory for inference-only rendering."""
+    # Only direct indexing dequantizes the gathered voxels, whereas grid_sample
+    # would need a dequantized copy of the entire volume for every render
+    if not (isinstance(self.renderer, Siddon) and self.renderer.mode == "index"):
+        raise ValueError(
+            "quantize_volume is only supported with renderer='siddon' and mode='index'"
+        )
+    if self.renderer.quantization is not None:
+        return  # Already quantized (requantizing would lose the original scale)
+    offset = self.density.min().item()
+    scale = (self.density.max().item() - offset) / 255
+    if scale == 0:
+        scale = 1.0  # The volume is constant, so every voxel is quantized to zero
+    density = ((self.density - offset) / scale).round().clamp(0, 255)
+    self.density = density.to(torch.uint8)
+
+    # Store the dequantization parameters in the renderer's state_dict
+    self.renderer.quantization = torch.tensor(
+        [scale, offset], dtype=torch.float32, device=self.density.device
+    )
+    self.renderer._volume_cache = None
+
+# %% ../notebooks/api/00_drr.ipynb 16
 @patch
 def perspective_projection(
     self: DRR,
@@ -226,7 +295,7 @@ def perspective_projection(
         x[..., 1] = self.detector.width - x[..., 1]
     return x[..., :2].flip(-1)
 
-# %% ../notebooks/api/00_drr.ipynb 13
+# %% ../notebooks/api/00_drr.ipynb 17
 from torch.nn.functional import pad
 
 
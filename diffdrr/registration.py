@@ -30,6 +30,9 @@ class Registration(nn.Module):
         self.convention = convention
 
     def forward(self, **kwargs):
+        # Without rendering options, skip the branches of DRR.forward that never change
+        if not kwargs and self.drr.patch_size is None:
+            return self.drr.forward_fast(self.pose)
         return self.drr(self.pose, **kwargs)
 
     @property
@@ -13,19 +13,26 @@ class Siddon(torch.nn.Module):
 
     def __init__(
         self,
-        mode: str = "nearest",  # Interpolation mode for grid_sample
+        mode: str = "nearest",  # Interpolation mode for grid_sample, or "index" to index the volume directly
         stop_gradients_through_grid_sample: bool = False,  # Apply torch.no_grad when calling grid_sample
         filter_intersections_outside_volume: bool = True,  # Use alphamin/max to filter the intersections
         eps: float = 1e-8,  # Small constant to avoid div by zero errors
+        torch_compile: bool = False,  # Fuse the elementwise ops with torch.compile
+        dtype: torch.dtype = None,  # Reduced precision for grid_sample (e.g., torch.bfloat16)
     ):
         super().__init__()
         self.mode = mode
         self.stop_gradients_through_grid_sample = stop_gradients_through_grid_sample
         self.filter_intersections_outside_volume = filter_intersections_outside_volume
         self.eps = eps
-
-    def dims(self, volume):
-        return torch.tensor(volume.shape).to(volume)
+        self.torch_compile = torch_compile
+        self.dtype = dtype
+        self.register_buffer(
+            "quantization", None
+        )  # (scale, offset) if the volume is stored as uint8 (only with mode="index")
+        self._volume_cache = None
+        self._geometry_cache = None
+        self._scratch = None  # Reused for sorting if autograd is not recording
 
     def forward(
         self,
@@ -35,93 +42,162 @@ class Siddon(torch.nn.Module):
         align_corners=False,
         mask=None,
     ):
-        dims = self.dims(volume)
+        dims, planes = _get_cached_geometry(self, volume, source)
+        direction = target - source + self.eps
+
+        # If no gradients flow through the rays, sort the intersections into reused buffers
+        if torch.is_grad_enabled() and (source.requires_grad or target.requires_grad):
+            out = None
+        else:
+            shape = (*target.shape[:-1], sum(len(plane) for plane in planes))
+            out = _get_scratch(self, shape, source)
 
         # Calculate the intersections of each ray with the planes comprising the CT volume
         alphas = _get_alphas(
             source,
-            target,
+            direction,
+            planes,
             dims,
-            self.eps,
             self.filter_intersections_outside_volume,
+            out,
         )
 
-        # Calculate the midpoint of every pair of adjacent intersections
-        # These midpoints lie exclusively in a single voxel
-        alphamid = (alphas[..., 0:-1] + alphas[..., 1:]) / 2
-
-        # Get the XYZ coordinate of each midpoint (normalized to [-1, +1]^3)
-        xyzs = _get_xyzs(alphamid, source, target, dims, self.eps)
+        # Get the XYZ coordinate of the midpoint between every pair of adjacent
+        # intersections (normalized to [-1, +1]^3, unless indexing the volume directly)
+        normalize = self.mode != "index"
+        get_midpoint_xyzs = _maybe_compile(_get_midpoint_xyzs, self.torch_compile)
+        xyzs = get_midpoint_xyzs(alphas, source, direction, dims, normalize)
 
         # Use torch.nn.functional.grid_sample to lookup the values of each intersected voxel
         if self.stop_gradients_through_grid_sample:
             with torch.no_grad():
-                img = _get_voxel(volume, xyzs, self.mode, align_corners=align_corners)
+                img = self._get_voxel(volume, xyzs, dims, align_corners)
         else:
-            img = _get_voxel(volume, xyzs, self.mode, align_corners=align_corners)
-
-        # Weight each intersected voxel by the length of the ray's intersection with the voxel
-        intersection_length = torch.diff(alphas, dim=-1)
-        img = img * intersection_length
+            img = self._get_voxel(volume, xyzs, dims, align_corners)
 
         # Handle optional masking
         if mask is None:
-            img = img.sum(dim=-1)
-            img = img.unsqueeze(1)
+            get_weighted_sum = _maybe_compile(_get_weighted_sum, self.torch_compile)
+            img = get_weighted_sum(img, alphas)
         else:
-            # Thanks to @Ivan for the clutch assist w/ pytorch tensor ops
-            # https://stackoverflow.com/questions/78323859/broadcast-pytorch-array-across-channels-based-on-another-array/78324614#78324614
-            B, D, _ = img.shape
+            # Weight each intersected voxel by the length of the ray's intersection with the voxel
+            intersection_length = torch.diff(alphas, dim=-1)
+            img = img * intersection_length
             C = int(mask.max().item() + 1)
-            channels = _get_voxel(mask, xyzs, align_corners=align_corners).long()
-            img = (
-                torch.zeros(B, C, D)
-                .to(img)
-                .scatter_add_(1, channels.transpose(-1, -2), img.transpose(-1, -2))
-            )
+            if self.mode == "index":
+                channels = _get_voxel_index(mask, xyzs, dims).long()
+            else:
+                channels = _get_voxel(
+                    _permute_volume(mask), xyzs, align_corners=align_corners
+                ).long()
+            img = _get_channel_sum(img, channels, C)
 
         # Multiply by ray length such that the proportion of attenuated energy is unitless
-        raylength = (target - source + self.eps).norm(dim=-1)
+        raylength = direction.norm(dim=-1)
         img *= raylength.unsqueeze(1)
         return img
 
+    def _get_voxel(self, volume, xyzs, dims, align_corners):
+        if self.mode == "index":
+            return _get_voxel_index(volume, xyzs, dims, self.quantization)
+
+        # Optionally sample in reduced precision, but accumulate in full precision
+        volume_5d = _get_cached_volume(self, volume, self.dtype)
+        img = _get_voxel(
+            volume_5d,
+            xyzs.to(volume_5d.dtype),
+            self.mode,
+            align_corners=align_corners,
+        )
+        return img.to(xyzs.dtype)
+
+    def release_scratch(self):
+        """Free the buffers that the ray intersections are sorted into without autograd."""
+        self._scratch = None
+
 # %% ../notebooks/api/01_renderers.ipynb 8
-def _get_alphas(source, target, dims, eps, filter_intersections_outside_volume):
+def _get_midpoint_xyzs(alphas, source, direction, dims, normalize=True):
+    """Calculates the XYZ coordinates of the midpoints between adjacent intersections."""
+    # These midpoints lie exclusively in a single voxel
+    alphamid = (alphas[..., 0:-1] + alphas[..., 1:]) / 2
+    return _get_xyzs(alphamid, source, direction, dims, normalize)
+
+
+def _get_weighted_sum(img, alphas):
+    """Weights each intersected voxel by its intersection length and sums along the ray."""
+    # Fuse the weighting and the reduction into a single batched dot product
+    # so the weighted voxel values are never materialized
+    intersection_length = torch.diff(alphas, dim=-1)
+    img = torch.einsum("bnk, bnk -> bn", img, intersection_length)
+    return img.unsqueeze(1)
+
+
+def _get_channel_sum(img, channels, n_channels):
+    """Sums the samples along each ray into the channel of the structure they belong to."""
+    # Flatten the (B, C, D) output so every sample is accumulated with a single 1D index
+    B, D, _ = img.shape
+    batch = torch.arange(B, device=img.device).view(B, 1, 1)
+    ray = torch.arange(D, device=img.device).view(1, D, 1)
+    index = ((batch * n_channels + channels) * D + ray).flatten()
+    img = img.new_zeros(B * n_channels * D).index_add_(0, index, img.flatten())
+    return img.view(B, n_channels, D)
+
+
+_compiled = {}
+
+
+def _maybe_compile(fn, enabled):
+    """Lazily wrap a function with torch.compile, reusing the compiled function."""
+    if not enabled:
+        return fn
+    if fn not in _compiled:
+        _compiled[fn] = torch.compile(fn, dynamic=True)
+    return _compiled[fn]
+
+
+def _get_alphas(
+    source, direction, planes, dims, filter_intersections_outside_volume, out=None
+):
     """Calculates the parametric intersections of each ray with the planes of the CT volume."""
-    # Parameterize the parallel XYZ planes that comprise the CT volumes
-    alphax = torch.arange(dims[0] + 1).to(source) - 0.5
-    alphay = torch.arange(dims[1] + 1).to(source) - 0.5
-    alphaz = torch.arange(dims[2] + 1).to(source) - 0.5
+    alphax, alphay, alphaz = planes
 
     # Calculate the parametric intersection of each ray with every plane
     sx, sy, sz = source[..., 0:1], source[..., 1:2], source[..., 2:3]
-    tx, ty, tz = target[..., 0:1], target[..., 1:2], target[..., 2:3]
-    alphax = (alphax.expand(len(source), 1, -1) - sx) / (tx - sx + eps)
-    alphay = (alphay.expand(len(source), 1, -1) - sy) / (ty - sy + eps)
-    alphaz = (alphaz.expand(len(source), 1, -1) - sz) / (tz - sz + eps)
+    dx, dy, dz = direction[..., 0:1], direction[..., 1:2], direction[..., 2:3]
+    alphax = (alphax.expand(len(source), 1, -1) - sx) / dx
+    alphay = (alphay.expand(len(source), 1, -1) - sy) / dy
+    alphaz = (alphaz.expand(len(source), 1, -1) - sz) / dz
     alphas = torch.cat([alphax, alphay, alphaz], dim=-1)
 
-    # Sort the intersections
-    alphas = torch.sort(alphas, dim=-1).values
+    # Sort the intersections (writing the values and indices into `out` if given)
+    alphas = torch.sort(alphas, dim=-1, out=out).values
+
+    # Clamp the intersections of each ray to the volume (the clamped intersections
+    # are duplicated, so segments outside have zero length). The volume is padded by
+    # a voxel, since grid_sample reads voxel i on [i, i + 1) and index mode on
+    # [i - 0.5, i + 0.5), and anything sampled in the padding is zero.
     if filter_intersections_outside_volume:
-        alphas = _filter_intersections_outside_volume(alphas, source, target, dims, eps)
+        alphamin, alphamax = _get_alpha_minmax(source, direction, dims, pad=1.0)
+        if out is None:
+            alphas = alphas.clamp(min=alphamin, max=alphamax)
+        else:
+            alphas.clamp_(min=alphamin, max=alphamax)
     return alphas
 
 
-def _filter_intersections_outside_volume(alphas, source, target, dims, eps):
+def _filter_intersections_outside_volume(alphas, source, direction, dims):
     """Remove interesections that are outside of the volume for all rays."""
-    alphamin, alphamax = _get_alpha_minmax(source, target, dims, eps)
+    alphamin, alphamax = _get_alpha_minmax(source, direction, dims)
     good_idxs = torch.logical_and(alphamin <= alphas, alphas <= alphamax)
     alphas = alphas[..., good_idxs.any(dim=[0, 1])]
     return alphas
 
 
-def _get_alpha_minmax(source, target, dims, eps):
+def _get_alpha_minmax(source, direction, dims, pad=0.0):
     """Calculate the first and last intersections of each ray with the volume."""
-    sdd = target - source + eps
-
-    alpha0 = (torch.zeros(3).to(source) - source) / sdd
-    alpha1 = ((dims - 1).to(source) - source) / sdd
+    # The volume spans the voxel centers 0 to dims - 1, padded by `pad` on every side
+    alpha0 = (-pad - source) / direction
+    alpha1 = (dims - 1 + pad - source) / direction
     alphas = torch.stack([alpha0, alpha1])
 
     alphamin = alphas.min(dim=0).values.max(dim=-1).values.unsqueeze(-1)
@@ -132,31 +208,116 @@ def _get_alpha_minmax(source, target, dims, eps):
     return alphamin, alphamax
 
 
-def _get_xyzs(alpha, source, target, dims, eps):
+def _get_xyzs(alpha, source, direction, dims, normalize=True):
     """Given a set of rays and parametric coordinates, calculates the XYZ coordinates."""
-    # Get the world coordinates of every point parameterized by alpha
-    xyzs = (
-        source.unsqueeze(-2)
-        + alpha.unsqueeze(-1) * (target - source + eps).unsqueeze(2)
-    ).unsqueeze(1)
+    # Normalize coordinates to be in [-1, +1] for grid_sample (the normalization
+    # is affine, so apply it per ray rather than to every sampled point)
+    if normalize:
+        source = 2 * source / dims - 1
+        direction = 2 * direction / dims
 
-    # Normalize coordinates to be in [-1, +1] for grid_sample
-    xyzs = 2 * xyzs / dims - 1
-    return xyzs
+    # Get the coordinates of every point parameterized by alpha in a single kernel
+    xyzs = torch.addcmul(
+        source.unsqueeze(-2), alpha.unsqueeze(-1), direction.unsqueeze(2)
+    )
+    return xyzs.unsqueeze(1)
 
 
 def _get_voxel(volume, xyzs, mode="nearest", align_corners=True):
     """Wraps torch.nn.functional.grid_sample to sample a volume at XYZ coordinates."""
     batch_size = len(xyzs)
     voxels = grid_sample(
-        input=volume.permute(2, 1, 0)[None, None].expand(batch_size, -1, -1, -1, -1),
+        input=volume.expand(batch_size, -1, -1, -1, -1),
         grid=xyzs,
         mode=mode,
         align_corners=align_corners,
     )[:, 0, 0]
     return voxels
 
-# %% ../notebooks/api/01_renderers.ipynb 10
+
+def _get_voxel_index(volume, xyzs, dims, quantization=None):
+    """Looks up the voxel containing each (unnormalized) XYZ coordinate by direct indexing."""
+    # Voxel i is bounded by the planes at i - 0.5 and i + 0.5
+    ijk = (xyzs[:, 0] + 0.5).floor().long()
+    dims = dims.long()  # The cached dimensions are already on the device
+    inside = ((0 <= ijk) & (ijk < dims)).all(dim=-1)
+
+    # Gather from the flattened volume, treating voxels outside the volume as zero
+    i, j, k = ijk.clamp(min=0).minimum(dims - 1).unbind(-1)
+    idx = (i * dims[1] + j) * dims[2] + k
+    voxels = torch.take(volume, idx)
+
+    # If the volume is quantized, only dequantize the gathered voxels
+    if quantization is not None:
+        scale, offset = quantization
+        voxels = voxels.to(xyzs.dtype) * scale + offset
+    return torch.where(inside, voxels, 0)
+
+
+def _get_scratch(renderer, shape, like):
+    """Get views of reused (values, indices) buffers to sort the intersections into."""
+    numel = shape[0] * shape[1] * shape[2]
+    scratch = renderer._scratch
+    if (
+        scratch is None
+        or scratch[0].numel() < numel
+        or scratch[0].dtype != like.dtype
+        or scratch[0].device != like.device
+    ):
+        # Allocate outside of inference mode so the buffers can be written in-place
+        # by later renders, whether or not they run in inference mode
+        with torch.inference_mode(False):
+            scratch = (
+                torch.empty(numel, dtype=like.dtype, device=like.device),
+                torch.empty(numel, dtype=torch.long, device=like.device),
+            )
+        renderer._scratch = scratch
+    return tuple(buffer[:numel].view(shape) for buffer in scratch)
+
+
+def _permute_volume(volume):
+    """Reshape a volume to the (1, 1, D, H, W) layout expected by grid_sample."""
+    return volume.permute(2, 1, 0)[None, None]
+
+
+def _get_cached_geometry(renderer, volume, source):
+    """Get the volume's dimensions and XYZ planes, reusing them until its shape changes."""
+    key = (volume.shape, source.device, source.dtype)
+    cache = renderer._geometry_cache
+    if cache is None or cache[0] != key:
+        # Allocate outside of inference mode so that renders recording gradients
+        # can save the cached tensors for backward
+        with torch.inference_mode(False):
+            dims = torch.tensor(volume.shape, device=source.device, dtype=source.dtype)
+            planes = [
+                torch.arange(n + 1, device=source.device, dtype=source.dtype) - 0.5
+                for n in volume.shape
+            ]
+        renderer._geometry_cache = (key, dims, planes)
+    return renderer._geometry_cache[1:]
+
+
+def _get_cached_volume(renderer, volume, dtype=None):
+    """Permute the volume into a channels-last buffer once and reuse it until it changes."""
+    dtype = volume.dtype if dtype is None else dtype
+    if volume.requires_grad:
+        return _permute_volume(volume).to(dtype)
+    cache = renderer._volume_cache
+    if (
+        cache is None
+        or cache[0] is not volume
+        or cache[1] != volume._version
+        or cache[2] != dtype
+    ):
+        # Build the cache outside of inference mode so it can be reused by renders
+        # that record gradients (grid_sample cannot save an inference tensor)
+        with torch.inference_mode(False):
+            volume_5d = _permute_volume(volume).to(dtype)
+            volume_5d = volume_5d.contiguous(memory_format=torch.channels_last_3d)
+        renderer._volume_cache = (volume, volume._version, dtype, volume_5d)
+    return renderer._volume_cache[3]
+
+# %% ../notebooks/api/01_renderers.ipynb 11
 class Trilinear(torch.nn.Module):
     """Differentiable X-ray renderer implemented with trilinear interpolation."""
 
@@ -167,6 +328,7 @@ class Trilinear(torch.nn.Module):
         mode: str = "bilinear",  # Interpolation mode for grid_sample
         filter_intersections_outside_volume: bool = True,  # Use alphamin/max to filter the intersections
         eps: float = 1e-8,  # Small constant to avoid div by zero errors
+        dtype: torch.dtype = None,  # Reduced precision for grid_sample (e.g., torch.bfloat16)
     ):
         super().__init__()
         self.near = near
@@ -174,9 +336,9 @@ class Trilinear(torch.nn.Module):
         self.mode = mode
         self.filter_intersections_outside_volume = filter_intersections_outside_volume
         self.eps = eps
-
-    def dims(self, volume):
-        return torch.tensor(volume.shape).to(volume)
+        self.dtype = dtype
+        self._volume_cache = None
+        self._geometry_cache = None
 
     def forward(
         self,
@@ -187,36 +349,41 @@ class Trilinear(torch.nn.Module):
         align_corners=False,
         mask=None,
     ):
-        dims = self.dims(volume)
+        dims, _ = _get_cached_geometry(self, volume, source)
+        direction = target - source + self.eps
 
         # Sample points along the rays and rescale to [-1, 1]
-        alphas = torch.linspace(self.near, self.far, n_points)[None, None].to(volume)
+        alphas = torch.linspace(self.near, self.far, n_points)[None, None].to(source)
         if self.filter_intersections_outside_volume:
             alphas = _filter_intersections_outside_volume(
-                alphas, source, target, dims, self.eps
+                alphas, source, direction, dims
             )
 
         # Render the DRR
         # Get the XYZ coordinate of each alpha, normalized for grid_sample
-        xyzs = _get_xyzs(alphas, source, target, dims, self.eps)
-
-        # Sample the volume with trilinear interpolation
-        img = _get_voxel(volume, xyzs, self.mode, align_corners=align_corners)
+        xyzs = _get_xyzs(alphas, source, direction, dims)
+
+        # Sample the volume with trilinear interpolation (optionally in reduced
+        # precision, but accumulate in full precision)
+        volume_5d = _get_cached_volume(self, volume, self.dtype)
+        img = _get_voxel(
+            volume_5d,
+            xyzs.to(volume_5d.dtype),
+            self.mode,
+            align_corners=align_corners,
+        ).to(xyzs.dtype)
 
         # Handle optional masking
         if mask is None:
             img = img.sum(dim=-1).unsqueeze(1)
         else:
-            B, D, _ = img.shape
             C = int(mask.max().item() + 1)
-            channels = _get_voxel(mask, xyzs, align_corners=align_corners).long()
-            img = (
-                torch.zeros(B, C, D)
-                .to(img)
-                .scatter_add_(1, channels.transpose(-1, -2), img.transpose(-1, -2))
-            )
+            channels = _get_voxel(
+                _permute_volume(mask), xyzs, align_corners=align_corners
+            ).long()
+            img = _get_channel_sum(img, channels, C)
 
         # Multiply by raylength and return the drr
-        raylength = (target - source + self.eps).norm(dim=-1).unsqueeze(1)
+        raylength = direction.norm(dim=-1).unsqueeze(1)
         img *= raylength / n_points
         return img
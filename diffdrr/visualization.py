@@ -3,8 +3,6 @@
 # %% ../notebooks/api/04_visualization.ipynb 3
 from __future__ import annotations
 
-import tempfile
-
 import imageio.v3 as iio
 import matplotlib
 import matplotlib.pyplot as plt
@@ -36,7 +34,7 @@ def plot_drr(
     if title is None or isinstance(title, str):
         title = [title] * n_imgs
     for img, ax, title in zip(img, axs, title):
-        ax.imshow(img.squeeze().cpu().detach(), cmap=cmap, **imshow_kwargs)
+        _plot_drr_fast(img, ax, cmap=cmap, **imshow_kwargs)
         _, height, width = img.shape
         ax.xaxis.tick_top()
         ax.set(
@@ -51,6 +49,16 @@ def plot_drr(
             ax.set_yticks([])
     return axs
 
+
+def _plot_drr_fast(img, ax, im=None, **imshow_kwargs):
+    """Plot a single DRR, or only update the data of an image that was already plotted."""
+    img = img.squeeze().detach().cpu().numpy()
+    if im is None:
+        return ax.imshow(img, **imshow_kwargs)
+    im.set_data(img)
+    im.set_clim(img.min(), img.max())
+    return im
+
 # %% ../notebooks/api/04_visualization.ipynb 6
 def plot_mask(
     img: torch.Tensor,
@@ -87,9 +95,14 @@ def plot_mask(
         return masks
 
 # %% ../notebooks/api/04_visualization.ipynb 7
+import contextlib
 import pathlib
+import queue
+import threading
 
 import pandas
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 from .drr import DRR
 
@@ -104,72 +117,160 @@ def animate(
     verbose: bool = True,
     dtype=torch.float32,
     device="cpu",
+    batch_size: int = 1,  # Number of poses to render at once (peak memory grows with it)
+    torch_compile: bool = False,  # Compile the DRR module with torch.compile
+    fp16: bool = False,  # Sample the volume in half precision (CUDA only)
     **kwargs,  # To pass to imageio.v3.imwrite
 ):
-    """Animate the optimization of a DRR."""
-    # Make the axes
-    if ground_truth is None:
-
-        def make_fig():
-            fig, ax_opt = plt.subplots(
-                figsize=(3, 3),
-                constrained_layout=True,
-            )
-            return fig, ax_opt
-
-    else:
-
-        def make_fig(ground_truth):
-            fig, (ax_fix, ax_opt) = plt.subplots(
-                ncols=2,
-                figsize=(6, 3),
-                constrained_layout=True,
-            )
-            plot_drr(ground_truth, axs=ax_fix)
-            ax_fix.set(xlabel="Fixed DRR")
-            return fig, ax_opt
+    """
+    Animate the optimization of a DRR.
 
-    # Compute DRRs, plot, and save to temporary folder
-    if verbose:
-        itr = tqdm(df.iterrows(), desc="Precomputing DRRs", total=len(df), ncols=75)
+    Rendering `batch_size > 1` poses per call amortizes the per-call overhead, but
+    the renderer's intermediates (e.g., every ray's intersections with Siddon's
+    method) are allocated for the whole batch. Only increase `batch_size` if
+    `batch_size` DRRs fit in memory at once.
+    """
+    # Make the axes once and reuse them for every frame (drawn with Agg, whatever
+    # the active backend, since the figure is never shown by pyplot)
+    if ground_truth is None:
+        fig = Figure(figsize=(3, 3), constrained_layout=True)
+        FigureCanvasAgg(fig)
+        ax_opt = fig.subplots()
     else:
-        itr = df.iterrows()
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        idxs = []
-        for idx, row in itr:
-            fig, ax_opt = make_fig() if ground_truth is None else make_fig(ground_truth)
-            params = row[["alpha", "beta", "gamma", "bx", "by", "bz"]].values
-            rotations = (
-                torch.tensor(row[["alpha", "beta", "gamma"]].values)
-                .unsqueeze(0)
-                .to(device=device, dtype=dtype)
-            )
-            translations = (
-                torch.tensor(row[["bx", "by", "bz"]].values)
-                .unsqueeze(0)
-                .to(device=device, dtype=dtype)
-            )
-            itr = drr(
-                rotations,
-                translations,
+        fig = Figure(figsize=(6, 3), constrained_layout=True)
+        FigureCanvasAgg(fig)
+        ax_fix, ax_opt = fig.subplots(ncols=2)
+        plot_drr(ground_truth, axs=ax_fix)
+        ax_fix.set(xlabel="Fixed DRR")
+
+    # Stack the poses from every iteration so they can be rendered in batches
+    # (copied to the device at once, from pinned memory if the device is a GPU)
+    poses = df[["alpha", "beta", "gamma", "bx", "by", "bz"]].to_numpy()
+    poses = torch.from_numpy(poses).to(dtype)
+    if torch.device(device).type == "cuda":
+        poses = poses.pin_memory()
+    poses = poses.to(device, non_blocking=True)
+    rotations, translations = poses[:, :3], poses[:, 3:]
+
+    # Every batch but the last has the same shape, so the compiled module is reused
+    render = torch.compile(drr, dynamic=False) if torch_compile else drr
+
+    # Optionally sample the volume in half precision (the DRRs are accumulated in
+    # full precision, and only 8 bits of each frame are displayed)
+    dtype_sample = torch.float16 if fp16 and poses.is_cuda else None
+
+    def render_batch(start):
+        with torch.inference_mode():
+            imgs = render(
+                rotations[start : start + batch_size],
+                translations[start : start + batch_size],
                 parameterization=parameterization,
                 convention=convention,
             )
-            _ = plot_drr(itr, axs=ax_opt)
-            ax_opt.set(xlabel=f"Moving DRR (loss = {row['loss']:.3f})")
-            fig.savefig(f"{tmpdir}/{idx}.png")
-            plt.close(fig)
-            idxs.append(idx)
-        frames = np.stack(
-            [iio.imread(f"{tmpdir}/{idx}.png") for idx in idxs],
-            axis=0,
-        )
+        return _copy_to_host(imgs.to(dtype))
 
-    # Make the animation
-    return iio.imwrite(out, frames, **kwargs)
+    # Compute DRRs, plot, and copy each frame out of the figure's canvas
+    losses = df["loss"].to_numpy()
+    if verbose:
+        itr = tqdm(losses, desc="Precomputing DRRs", ncols=75)
+    else:
+        itr = losses
+
+    # Render batches in a background thread, so the next batch of DRRs is computed
+    # while the frames of the current batch are plotted and encoded
+    batches = queue.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def put(item):
+        # Stop waiting for space in the queue once the frames are no longer consumed
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def render_batches():
+        try:
+            for start in range(0, len(losses), batch_size):
+                if stop.is_set() or not put(render_batch(start)):
+                    return
+        except Exception as e:
+            put(e)
+
+    def plot_frames():
+        producer = threading.Thread(target=render_batches, daemon=True)
+        producer.start()
+        try:
+            for jdx, loss in enumerate(itr):
+                # Each batch of poses is rendered with a single call to the DRR module
+                if jdx % batch_size == 0:
+                    batch = batches.get()
+                    if isinstance(batch, Exception):
+                        raise batch
+                    imgs, copied = batch
+                    if copied is not None:
+                        copied.synchronize()
+                # Plot the first DRR, then only update the image data for the rest
+                kdx = jdx % batch_size
+                if jdx == 0:
+                    _ = plot_drr(imgs[kdx : kdx + 1], axs=ax_opt)
+                    im = ax_opt.images[0]
+                else:
+                    _plot_drr_fast(imgs[kdx], ax_opt, im)
+                ax_opt.set(xlabel=f"Moving DRR (loss = {loss:.3f})")
+                fig.canvas.draw()
+                yield np.array(fig.canvas.buffer_rgba())
+                if jdx == 0:
+                    fig.set_layout_engine("none")  # Keep the layout of the first frame
+        finally:
+            stop.set()
+            producer.join()
+
+    # Make the animation, streaming the frames to the writer unless encoding in memory
+    # (closing the frames stops and joins the rendering thread, even if writing fails)
+    with _sampling_dtype(drr, dtype_sample):
+        with contextlib.closing(plot_frames()) as frames:
+            if out == "<bytes>":
+                return iio.imwrite(out, np.stack(list(frames)), **kwargs)
+            open_kwargs = {
+                key: kwargs.pop(key)
+                for key in ["plugin", "extension", "format_hint"]
+                if key in kwargs
+            }
+            with iio.imopen(out, "w", legacy_mode=False, **open_kwargs) as writer:
+                for frame in frames:
+                    writer.write(frame[None], **kwargs)
+
+
+@contextlib.contextmanager
+def _sampling_dtype(drr, dtype):
+    """Temporarily sample the volume in a reduced precision, if a dtype is given."""
+    if dtype is None:
+        yield
+        return
+    previous = drr.renderer.dtype
+    drr.renderer.dtype = dtype
+    try:
+        yield
+    finally:
+        drr.renderer.dtype = previous
+
+
+def _copy_to_host(imgs):
+    """Start copying a batch of images to the CPU, returning an event that marks when it is done."""
+    if not imgs.is_cuda:
+        return imgs, None
+    host = torch.empty(imgs.shape, dtype=imgs.dtype, pin_memory=True)
+    host.copy_(imgs, non_blocking=True)
+    copied = torch.cuda.Event()
+    copied.record(torch.cuda.current_stream(imgs.device))
+    return host, copied
 
 # %% ../notebooks/api/04_visualization.ipynb 10
+import warnings
+
 import pyvista
 import vtk
 from torchio import Subject
@@ -180,7 +281,7 @@ vtk.vtkLogger.SetStderrVerbosity(vtk.vtkLogger.ConvertToVerbosity(-1))
 # %% ../notebooks/api/04_visualization.ipynb 11
 def drr_to_mesh(
     subject: Subject,  # torchio.Subject with a `volume` attribute
-    method: str,  # Either `surface_nets` or `marching_cubes`
+    method: str,  # Either `surface_nets`, `marching_cubes`, or `marching_cubes_gpu`
     threshold: float = 300,  # Min value for marching cubes (Hounsfield units)
     verbose: bool = True,  # Display progress bars for mesh processing steps
 ):
@@ -189,14 +290,26 @@ def drr_to_mesh(
 
     If using `method=="surface_nets"`, ensure you have `pyvista>=0.43` and `vtk>=9.3` installed.
 
+    If using `method=="marching_cubes_gpu"`, ensure you have `torchmcubes` installed
+    (otherwise, falls back to `method=="marching_cubes"`).
+
     The mesh processing steps are:
 
     1. Keep only largest connected components
     2. Smooth
-    3. Decimate (if `method=="marching_cubes"`)
+    3. Decimate (if using marching cubes)
     4. Fill any holes
     5. Clean (remove any redundant vertices/edges)
     """
+    if method == "marching_cubes_gpu":
+        try:
+            from torchmcubes import marching_cubes
+        except ImportError:
+            warnings.warn(
+                "torchmcubes is not installed, using `marching_cubes` instead"
+            )
+            method = "marching_cubes"
+
     # Ensure the image is in RAS+ for pyvista's sake
     canonicalize = ToCanonical()
     subject = canonicalize(subject)
@@ -208,17 +321,33 @@ def drr_to_mesh(
         origin=subject.volume.origin,
     )
 
-    if method == "marching_cubes":
+    if method == "marching_cubes_gpu":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        volume = subject.volume.data[0].to(device, torch.float32).contiguous()
+        verts, faces = marching_cubes(volume, threshold)
+        # Vertices are (x, y, z) indices into the volume, which is indexed as (z, y, x)
+        verts = verts.flip(-1).cpu().numpy()
+        verts = verts * subject.volume.spacing + subject.volume.origin
+        faces = faces.cpu().numpy()
+        faces = np.hstack([np.full((len(faces), 1), 3), faces])
+        mesh = pyvista.PolyData(verts, faces)
+    elif method == "marching_cubes":
+        # Use VTK's Flying Edges, a faster and multithreaded marching cubes, if available
+        if hasattr(vtk, "vtkFlyingEdges3D"):
+            contour_method = "flying_edges"
+        else:
+            contour_method = "marching_cubes"
         mesh = grid.contour(
             isosurfaces=1,
-            scalars=subject.volume.data[0].cpu().numpy().flatten(order="F"),
+            scalars=subject.volume.data[0].cpu().numpy().ravel(order="F"),
             rng=[threshold, torch.inf],
-            method="marching_cubes",
+            method=contour_method,
             progress_bar=verbose,
         )
     elif method == "surface_nets":
+        # Threshold before reordering the voxels so only a boolean volume is copied
         grid.point_data["values"] = (
-            subject.volume.data[0].cpu().numpy().flatten(order="F") > threshold
+            (subject.volume.data[0] > threshold).cpu().numpy().ravel(order="F")
         )
         try:
             mesh = grid.contour_labeled(smoothing=True, progress_bar=verbose)
@@ -228,7 +357,7 @@ def drr_to_mesh(
             )
     else:
         raise ValueError(
-            f"method must be `marching_cubes` or `surface_nets`, not {method}"
+            f"method must be `marching_cubes`, `marching_cubes_gpu`, or `surface_nets`, not {method}"
         )
 
     # Preprocess the mesh
@@ -245,7 +374,7 @@ def drr_to_mesh(
         inplace=True,
         progress_bar=verbose,
     )
-    if method == "marching_cubes":
+    if method.startswith("marching_cubes"):
         mesh.decimate_pro(0.25, inplace=True, progress_bar=verbose)
     mesh.fill_holes(100, inplace=True, progress_bar=verbose)
     mesh.clean(inplace=True, progress_bar=verbose)
@@ -266,7 +395,7 @@ def labelmap_to_mesh(
         spacing=subject.mask.spacing,
         origin=subject.mask.origin,
     )
-    grid.point_data["values"] = subject.mask.data[0].numpy().flatten(order="F")
+    grid.point_data["values"] = subject.mask.data[0].numpy().ravel(order="F")
     mesh = grid.contour_labeled(smoothing=True, progress_bar=verbose)
     mesh.smooth_taubin(
         n_iter=100,
@@ -286,22 +415,33 @@ from .pose import RigidTransform
 
 
 def img_to_mesh(
-    drr: DRR, pose: RigidTransform, calibration: RigidTransform = None, **kwargs
+    drr: DRR,
+    pose: RigidTransform,
+    calibration: RigidTransform = None,
+    fp16: bool = False,  # Sample the volume in half precision (CUDA only)
+    **kwargs,
 ):
     """
     For a given pose (not batched), turn the camera and detector into a mesh.
     Additionally, render the DRR for the pose. Convert into a texture that
     can be applied to the detector mesh.
     """
+    # Render the DRR (through the module, so that patches are respected), and get
+    # the detector geometry for the meshes
+    with torch.inference_mode():
+        dtype_sample = torch.float16 if fp16 and drr.density.is_cuda else None
+        with _sampling_dtype(drr, dtype_sample):
+            img = drr(pose, calibration=calibration)
+        source, target = drr.detector(pose, calibration)
+
     # Turn DRR img into a texture that can be applied to a mesh
-    img = drr(pose, calibration)
-    img = img.cpu().squeeze().detach().numpy()
+    # (normalized on the DRR's device so only the uint8 texture is copied to the CPU)
+    img = img.squeeze()
     img = (img - img.min()) / (img.max() - img.min())
-    img = (255.0 * img).astype(np.uint8)
+    img = (255.0 * img).to(torch.uint8).cpu().numpy()
     texture = pyvista.numpy_to_texture(img)
 
     # Make a mesh for the camera and the principal ray
-    source, target = drr.detector(pose, calibration)
     source = source.squeeze().cpu().detach().numpy()
     target = (
         target.reshape(drr.detector.height, drr.detector.width, 3)
@@ -334,22 +474,27 @@ import numpy as np
 
 
 def _make_camera_frustum_mesh(source, target, size=0.125):
-    vertices = np.stack(
-        [
-            source + size * (target[0, 0] - source),
-            source + size * (target[-1, 0] - source),
-            source + size * (target[-1, -1] - source),
-            source + size * (target[0, -1] - source),
-            source,
-        ]
-    )
-    faces = np.hstack(
-        [
-            [4, 0, 1, 2, 3],
-            [3, 0, 1, 4],
-            [3, 1, 2, 4],
-            [3, 0, 3, 4],
-            [3, 2, 3, 4],
-        ]
-    )
-    return pyvista.PolyData(vertices, faces)
+    """Make the frustum for one camera, or for a batch of cameras as a single mesh."""
+    # Scale the corners of every detector plane towards its source, writing the
+    # vertices of every frustum directly into a single preallocated buffer
+    source = source.reshape(-1, 1, 3)
+    target = target.reshape(len(source), *target.shape[-3:])
+    corners = target[:, [0, -1, -1, 0], [0, 0, -1, -1]]
+    vertices = np.empty((len(source), 5, 3), dtype=np.result_type(source, target))
+    np.multiply(size, corners - source, out=vertices[:, :4])
+    vertices[:, :4] += source
+    vertices[:, 4] = source[:, 0]
+
+    # Offset the vertex indices of each frustum's faces (but not the face sizes)
+    offsets = 5 * np.arange(len(source))[:, None] * _FRUSTUM_IS_INDEX
+    faces = (_FRUSTUM_FACES + offsets).ravel()
+    return pyvista.PolyData(vertices.reshape(-1, 3), faces)
+
+
+# A quadrilateral base and four triangular sides (each face is prefixed by its number of vertices)
+_FRUSTUM_FACES = np.array(
+    [4, 0, 1, 2, 3, 3, 0, 1, 4, 3, 1, 2, 4, 3, 0, 3, 4, 3, 2, 3, 4],
+    dtype=np.int32,
+)
+_FRUSTUM_IS_INDEX = np.ones_like(_FRUSTUM_FACES, dtype=bool)
+_FRUSTUM_IS_INDEX[[0, 5, 9, 13, 17]] = False